@@ -6,68 +6,189 @@ and save it to a separate file.
 
 import json
 import argparse
+import mmap
 import sys
 from pathlib import Path
 
+try:
+    import ijson  # optional: streams large exports chat-by-chat
+except ImportError:
+    ijson = None
 
-def extract_conversation(input_file, conversation_id, output_file=None):
+try:
+    import orjson  # optional: fast C JSON serializer
+except ImportError:
+    orjson = None
+
+
+def open_export(path):
+    """
+    Open an export file for reading, memory-mapped when possible.
+
+    The mapping lets the kernel page the file in directly, skipping
+    Python's buffered IO; pages past an early exit from the chat scan
+    are never faulted in at all. Falls back to a plain binary file when
+    mapping fails (e.g. empty files).
+
+    Args:
+        path (str): Path to the export file
+
+    Returns:
+        A binary file-like object (mmap or file)
+    """
+    f = open(path, 'rb')
+    try:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return f
+    f.close()
+    return mm
+
+
+def save_conversation(conversation, output_file):
+    """
+    Save a conversation as pretty-printed JSON.
+
+    Uses orjson when available: it serializes straight to UTF-8 bytes,
+    several times faster than the stdlib encoder.
+
+    Args:
+        conversation (dict): The chat to save
+        output_file (str): Destination path
+    """
+    if orjson is not None:
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(conversation, option=orjson.OPT_INDENT_2))
+    else:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(conversation, f, indent=2, ensure_ascii=False)
+
+
+def iter_chats(f):
+    """
+    Iterate over the chats in an export file one at a time.
+
+    When ijson is available the 'chats.list' array is streamed lazily, so
+    only one chat is held in memory at a time (exports are often hundreds
+    of MB). Falls back to json.load on the whole file otherwise.
+
+    Args:
+        f: File object opened in binary mode
+
+    Yields:
+        dict: One chat at a time
+    """
+    if ijson is not None:
+        found = False
+        # use_float: ijson yields Decimal for JSON floats by default,
+        # which the JSON writers refuse to serialize (location messages
+        # carry float coordinates)
+        for chat in ijson.items(f, 'chats.list.item', use_float=True):
+            found = True
+            yield chat
+        if found:
+            return
+        # Not a full export; re-parse the whole file below
+        f.seek(0)
+
+    # Full parse: orjson's C decoder is several times faster than the
+    # stdlib on large UTF-8 payloads
+    if orjson is not None:
+        data = orjson.loads(f.read())
+    else:
+        data = json.load(f)
+    if 'chats' in data and 'list' in data['chats']:
+        yield from data['chats']['list']
+    elif isinstance(data, list):
+        yield from data
+    else:
+        raise ValueError("Unexpected JSON structure. Expected 'chats.list' or a list at root.")
+
+
+def find_conversations(input_file, conversation_ids, recent=False):
+    """
+    Find several conversations by ID in a single pass over the export.
+
+    The requested IDs are kept in a set, so each chat costs one O(1)
+    membership check instead of re-scanning the list per ID. The scan
+    stops as soon as every requested ID has been found.
+
+    With recent=True the chats are searched newest-file-position-first,
+    which finds recently active chats sooner when the export lists them
+    last. This needs the full chat list in memory, so the streaming
+    early exit does not apply.
+
+    Args:
+        input_file (str): Path to the input JSON file
+        conversation_ids (list): IDs of the conversations to extract
+        recent (bool): Search the chat list in reverse order
+
+    Returns:
+        dict: Mapping of conversation ID to chat, for the IDs found
+    """
+    wanted = set(conversation_ids)
+    found = {}
+    seen_ids = []
+
+    with open_export(input_file) as f:
+        chats = iter_chats(f)
+        if recent:
+            chats = reversed(list(chats))
+        for chat in chats:
+            chat_id = chat.get('id')
+            if chat_id in wanted:
+                found[chat_id] = chat
+                wanted.discard(chat_id)
+                if not wanted:
+                    break
+            elif len(seen_ids) < 10:
+                seen_ids.append(chat_id)
+
+    for conversation_id in conversation_ids:
+        if conversation_id not in found:
+            print(f"Error: Conversation with ID {conversation_id} not found.")
+            print(f"Available IDs: {seen_ids}...")
+
+    return found
+
+
+def extract_conversation(input_file, conversation_id, output_file=None, recent=False):
     """
     Extract a conversation by ID from the JSON export.
-    
+
     Args:
         input_file (str): Path to the input JSON file
         conversation_id (int): ID of the conversation to extract
         output_file (str, optional): Path to save the extracted conversation
-    
+        recent (bool): Search the chat list newest-file-position-first
+
     Returns:
         dict: The extracted conversation, or None if not found
     """
     try:
-        # Read the input JSON file
-        with open(input_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Navigate to the chats list
-        if 'chats' in data and 'list' in data['chats']:
-            chats_list = data['chats']['list']
-        elif isinstance(data, list):
-            # If the root is already a list
-            chats_list = data
-        else:
-            print("Error: Unexpected JSON structure. Expected 'chats.list' or a list at root.")
-            return None
-        
-        # Search for the conversation by ID
-        conversation = None
-        for chat in chats_list:
-            if chat.get('id') == conversation_id:
-                conversation = chat
-                break
-        
+        conversation = find_conversations(input_file, [conversation_id],
+                                          recent=recent).get(conversation_id)
         if conversation is None:
-            print(f"Error: Conversation with ID {conversation_id} not found.")
-            print(f"Available IDs: {[chat.get('id') for chat in chats_list[:10]]}...")
             return None
-        
+
         # Display some info about the conversation
         chat_type = conversation.get('type', 'unknown')
         num_messages = len(conversation.get('messages', []))
         chat_name = conversation.get('name', 'N/A')
-        
+
         print(f"Found conversation:")
         print(f"  ID: {conversation_id}")
         print(f"  Name: {chat_name}")
         print(f"  Type: {chat_type}")
         print(f"  Messages: {num_messages}")
-        
+
         # Save to output file if specified
         if output_file:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(conversation, f, indent=2, ensure_ascii=False)
+            save_conversation(conversation, output_file)
             print(f"\nConversation saved to: {output_file}")
-        
+
         return conversation
-        
+
     except FileNotFoundError:
         print(f"Error: File '{input_file}' not found.")
         return None
@@ -87,34 +208,32 @@ def list_conversations(input_file):
         input_file (str): Path to the input JSON file
     """
     try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Navigate to the chats list
-        if 'chats' in data and 'list' in data['chats']:
-            chats_list = data['chats']['list']
-        elif isinstance(data, list):
-            chats_list = data
-        else:
-            print("Error: Unexpected JSON structure.")
-            return
-        
-        print(f"Found {len(chats_list)} conversations:\n")
-        print(f"{'ID':<15} {'Type':<20} {'Name':<40} {'Messages'}")
-        print("-" * 90)
-        
-        for chat in chats_list:
-            chat_id = chat.get('id', 'N/A')
-            chat_type = chat.get('type', 'N/A')
-            chat_name = chat.get('name', 'N/A')
-            num_messages = len(chat.get('messages', []))
-            
-            # Truncate name if too long
-            if len(str(chat_name)) > 37:
-                chat_name = str(chat_name)[:37] + "..."
-            
-            print(f"{chat_id:<15} {chat_type:<20} {chat_name:<40} {num_messages}")
-        
+        # Rows are batched and written in chunks instead of one print
+        # per chat, while still streaming one chat at a time
+        lines = [f"{'ID':<15} {'Type':<20} {'Name':<40} {'Messages'}",
+                 "-" * 90]
+        count = 0
+        with open_export(input_file) as f:
+            for chat in iter_chats(f):
+                chat_id = chat.get('id', 'N/A')
+                chat_type = chat.get('type') or 'N/A'
+                chat_name = chat.get('name') or 'N/A'
+                num_messages = len(chat.get('messages', []))
+
+                # Truncate name if too long
+                if len(str(chat_name)) > 37:
+                    chat_name = str(chat_name)[:37] + "..."
+
+                lines.append(f"{chat_id:<15} {chat_type:<20} {chat_name:<40} {num_messages}")
+                count += 1
+
+                if len(lines) >= 1000:
+                    sys.stdout.write('\n'.join(lines) + '\n')
+                    lines.clear()
+
+        lines.append(f"\nFound {count} conversations.")
+        sys.stdout.write('\n'.join(lines) + '\n')
+
     except Exception as e:
         print(f"Error: {e}")
 
@@ -130,7 +249,10 @@ Examples:
   
   # Extract conversation by ID
   python extract_conversation.py input.json --id 168168628
-  
+
+  # Extract several conversations in one pass
+  python extract_conversation.py input.json --ids 168168628,777000
+
   # Extract and save to specific file
   python extract_conversation.py input.json --id 168168628 --output my_chat.json
         """
@@ -139,10 +261,14 @@ Examples:
     parser.add_argument('input_file', help='Path to the input JSON file')
     parser.add_argument('--id', type=int, dest='conversation_id',
                         help='ID of the conversation to extract')
+    parser.add_argument('--ids', dest='conversation_ids',
+                        help='Comma-separated IDs to extract in a single pass (e.g. 1,2,3)')
     parser.add_argument('--output', '-o', dest='output_file',
                         help='Output file path (default: conversation_<ID>.json)')
     parser.add_argument('--list', '-l', action='store_true',
                         help='List all available conversations')
+    parser.add_argument('--recent', action='store_true',
+                        help='Search the chat list in reverse, useful when recent chats are listed last')
     
     args = parser.parse_args()
     
@@ -151,9 +277,42 @@ Examples:
         list_conversations(args.input_file)
         return
     
+    # Batched extraction: one scan of the file, one output file per ID
+    if args.conversation_ids:
+        if args.output_file:
+            parser.error("--output cannot be combined with --ids; files are named conversation_<ID>.json")
+
+        try:
+            # Dedupe while keeping order, so repeated IDs don't make the
+            # found count fall short of the requested count
+            conversation_ids = list(dict.fromkeys(
+                int(part) for part in args.conversation_ids.split(',')))
+        except ValueError:
+            parser.error("--ids must be a comma-separated list of integers")
+
+        try:
+            found = find_conversations(args.input_file, conversation_ids, recent=args.recent)
+            for conversation_id, conversation in found.items():
+                output_file = f"conversation_{conversation_id}.json"
+                save_conversation(conversation, output_file)
+                print(f"Conversation {conversation_id} saved to: {output_file}")
+        except FileNotFoundError:
+            print(f"Error: File '{args.input_file}' not found.")
+            sys.exit(1)
+        except json.JSONDecodeError as e:
+            print(f"Error: Failed to parse JSON file. {e}")
+            sys.exit(1)
+        except Exception as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+
+        if len(found) < len(conversation_ids):
+            sys.exit(1)
+        return
+
     # Extract conversation
     if args.conversation_id is None:
-        parser.error("Please specify --id or use --list to see available conversations")
+        parser.error("Please specify --id, --ids or use --list to see available conversations")
     
     # Generate output filename if not provided
     output_file = args.output_file
@@ -161,7 +320,8 @@ Examples:
         output_file = f"conversation_{args.conversation_id}.json"
     
     # Extract the conversation
-    conversation = extract_conversation(args.input_file, args.conversation_id, output_file)
+    conversation = extract_conversation(args.input_file, args.conversation_id, output_file,
+                                        recent=args.recent)
     
     if conversation is None:
         sys.exit(1)
@@ -5,33 +5,104 @@ Parse Telegram chat export JSON and extract chat information.
 
 import json
 import argparse
+import mmap
+import sys
+
+try:
+    import ijson  # optional: streams large exports chat-by-chat
+except ImportError:
+    ijson = None
+
+try:
+    import orjson  # optional: fast C JSON parser
+except ImportError:
+    orjson = None
+
+
+def open_export(path):
+    """
+    Open an export file for reading, memory-mapped when possible.
+
+    The mapping lets the kernel page the file in directly, skipping
+    Python's buffered IO. Falls back to a plain binary file when mapping
+    fails (e.g. empty files).
+
+    Args:
+        path: Path to the export file
+
+    Returns:
+        A binary file-like object (mmap or file)
+    """
+    f = open(path, 'rb')
+    try:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return f
+    f.close()
+    return mm
+
+
+def iter_chats(f):
+    """
+    Iterate over the chats in an export file one at a time.
+
+    When ijson is available the 'chats.list' array is streamed lazily,
+    keeping only one chat in memory at a time instead of the whole export.
+    Falls back to json.load otherwise.
+
+    Args:
+        f: File object opened in binary mode
+
+    Yields:
+        dict: One chat at a time
+    """
+    if ijson is not None:
+        found = False
+        # use_float: ijson yields Decimal for JSON floats by default,
+        # which the JSON writers refuse to serialize (location messages
+        # carry float coordinates)
+        for chat in ijson.items(f, 'chats.list.item', use_float=True):
+            found = True
+            yield chat
+        if found:
+            return
+        f.seek(0)
+
+    # Full parse: orjson's C decoder is several times faster than the
+    # stdlib on large UTF-8 payloads
+    if orjson is not None:
+        data = orjson.loads(f.read())
+    else:
+        data = json.load(f)
+    if 'chats' in data and 'list' in data['chats']:
+        yield from data['chats']['list']
 
 
 def parse_chats(json_file_path):
     """
     Parse the JSON file and extract name, type, and id from all chats.
-    
+
     Args:
         json_file_path: Path to the result.json file
-        
+
     Returns:
         List of dictionaries containing name, type, and id for each chat
     """
-    with open(json_file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
     chats_info = []
-    
-    # Navigate to the chats list
-    if 'chats' in data and 'list' in data['chats']:
-        for chat in data['chats']['list']:
+
+    with open_export(json_file_path) as f:
+        for chat in iter_chats(f):
+            name = chat.get('name') or 'N/A'
             chat_info = {
-                'name': chat.get('name') or 'N/A',
+                'name': name,
                 'type': chat.get('type') or 'N/A',
-                'id': chat.get('id', 'N/A')
+                'id': chat.get('id', 'N/A'),
+                # Cached once here so case-insensitive filtering doesn't
+                # re-lower every name on every filter call
+                '_name_lower': name.lower()
             }
             chats_info.append(chat_info)
-    
+
     return chats_info
 
 
@@ -48,18 +119,33 @@ def filter_chats(chats, name=None, chat_type=None, chat_id=None):
     Returns:
         Filtered list of chats
     """
-    filtered = chats
-    
-    if name:
-        filtered = [c for c in filtered if name.lower() in c['name'].lower()]
-    
-    if chat_type:
-        filtered = [c for c in filtered if c['type'] == chat_type]
-    
+    # Resolve the ID first: a dict lookup narrows the candidates to at
+    # most one chat before the other predicates run
     if chat_id is not None:
-        filtered = [c for c in filtered if c['id'] == chat_id]
-    
-    return filtered
+        id_index = {c['id']: c for c in chats}
+        candidates = [id_index[chat_id]] if chat_id in id_index else []
+    else:
+        candidates = chats
+
+    # Single pass for the remaining criteria instead of one intermediate
+    # list per filter
+    needle = name.lower() if name else None
+    return [c for c in candidates
+            if (needle is None or needle in c['_name_lower'])
+            and (chat_type is None or c['type'] == chat_type)]
+
+
+def public_chats(chats):
+    """
+    Strip internal cache keys (leading underscore) before display or saving.
+
+    Args:
+        chats: List of chat dictionaries
+
+    Returns:
+        List of chat dictionaries without internal keys
+    """
+    return [{k: v for k, v in c.items() if not k.startswith('_')} for c in chats]
 
 
 def display_chats(chats, show_full=False):
@@ -75,14 +161,29 @@ def display_chats(chats, show_full=False):
         return
     
     if show_full:
-        print(json.dumps(chats, indent=2, ensure_ascii=False))
+        if orjson is not None:
+            # Serialize one chat at a time straight to the byte stream
+            # instead of building one giant pretty-printed string, while
+            # keeping the same JSON-array shape as the stdlib branch
+            out = sys.stdout.buffer
+            out.write(b'[\n')
+            for i, chat in enumerate(public_chats(chats)):
+                if i:
+                    out.write(b',\n')
+                out.write(orjson.dumps(chat, option=orjson.OPT_INDENT_2))
+            out.write(b'\n]\n')
+            out.flush()
+        else:
+            print(json.dumps(public_chats(chats), indent=2, ensure_ascii=False))
     else:
-        print(f"Total chats found: {len(chats)}\n")
-        print("-" * 80)
-        print(f"{'Name':<40} {'Type':<20} {'ID':<15}")
-        print("-" * 80)
-        for chat in chats:
-            print(f"{chat['name']:<40} {chat['type']:<20} {chat['id']:<15}")
+        # One write for the whole table rather than one print (with its
+        # lock acquisition and flush) per row
+        lines = [f"Total chats found: {len(chats)}\n",
+                 "-" * 80,
+                 f"{'Name':<40} {'Type':<20} {'ID':<15}",
+                 "-" * 80]
+        lines.extend(f"{chat['name']:<40} {chat['type']:<20} {chat['id']:<15}" for chat in chats)
+        sys.stdout.write('\n'.join(lines) + '\n')
 
 
 def main():
@@ -175,7 +276,7 @@ Examples:
     # Save to output file if specified
     if args.output:
         with open(args.output, 'w', encoding='utf-8') as f:
-            json.dump(chats, f, indent=2, ensure_ascii=False)
+            json.dump(public_chats(chats), f, indent=2, ensure_ascii=False)
         print(f"\nResults saved to {args.output}")
     
     # Save all results to default files (only when no filters and --save-all flag is used)
@@ -195,7 +296,7 @@ Examples:
         # Optional: Save as JSON
         json_output = 'chats_list.json'
         with open(json_output, 'w', encoding='utf-8') as f:
-            json.dump(chats, f, indent=2, ensure_ascii=False)
+            json.dump(public_chats(chats), f, indent=2, ensure_ascii=False)
         
         print(f"JSON output saved to {json_output}")
 
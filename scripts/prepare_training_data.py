@@ -14,12 +14,92 @@ Output format includes name metadata for each message to support multi-person co
 {"role": "user", "name": "PersonName", "content": "message text"}
 """
 
+import array
 import json
 import argparse
-from datetime import datetime, timedelta
-from pathlib import Path
-from collections import defaultdict
-from typing import List, Dict, Any
+import mmap
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from collections import namedtuple
+from typing import List, Dict
+
+try:
+    import ijson  # optional: streams large exports chat-by-chat
+except ImportError:
+    ijson = None
+
+try:
+    import numpy as np  # optional: vectorizes the turn/conversation grouping
+except ImportError:
+    np = None
+
+try:
+    import orjson  # optional: fast C JSON serializer
+except ImportError:
+    orjson = None
+
+try:
+    from numba import njit  # optional: JIT-compiles the boundary scans
+except ImportError:
+    njit = None
+
+
+if np is not None and njit is not None:
+    # JIT-compiled boundary scans: with the times as int64 arrays and the
+    # senders encoded as small integer indices, the whole scan runs as
+    # machine code with no interpreter dispatch. cache=True persists the
+    # compiled kernels across CLI runs.
+
+    @njit(cache=True)
+    def _scan_turn_starts(times, sender_ids, window):
+        n = times.shape[0]
+        starts = np.empty(n, dtype=np.int64)
+        starts[0] = 0
+        count = 1
+        for i in range(1, n):
+            if sender_ids[i] != sender_ids[i - 1] or times[i] - times[i - 1] > window:
+                starts[count] = i
+                count += 1
+        return starts[:count]
+
+    @njit(cache=True)
+    def _scan_conversation_starts(first_times, last_times, gap):
+        n = first_times.shape[0]
+        starts = np.empty(n, dtype=np.int64)
+        starts[0] = 0
+        count = 1
+        for i in range(1, n):
+            if first_times[i] - last_times[i - 1] > gap:
+                starts[count] = i
+                count += 1
+        return starts[:count]
+else:
+    _scan_turn_starts = None
+    _scan_conversation_starts = None
+
+
+# Lightweight per-message view used by the grouping and formatting passes.
+# Tuple field access is C-level, noticeably faster than dict.get per
+# message, and the unixtime is converted to int exactly once
+Msg = namedtuple('Msg', ['sender', 'time', 'text'])
+
+
+def open_export(path: str):
+    """
+    Open an export file for reading, memory-mapped when possible.
+
+    The mapping lets the kernel page the file in directly, skipping
+    Python's buffered IO. Falls back to a plain binary file when mapping
+    fails (e.g. empty files).
+    """
+    f = open(path, 'rb')
+    try:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return f
+    f.close()
+    return mm
 
 
 class ChatDataProcessor:
@@ -48,23 +128,43 @@ class ChatDataProcessor:
     def load_chats(self, input_file: str) -> List[Dict]:
         """Load chats from JSON file."""
         print(f"Loading chats from {input_file}...")
-        with open(input_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Handle different JSON structures
-        if 'chats' in data and 'list' in data['chats']:
-            # Full Telegram export: {"chats": {"list": [...]}}
-            chats = data['chats']['list']
-        elif isinstance(data, list):
-            # Array of chats: [...]
-            chats = data
-        elif isinstance(data, dict) and 'messages' in data:
-            # Single chat object (extracted conversation): {"name": "...", "messages": [...]}
-            chats = [data]
-            print(f"  (Single conversation file detected)")
-        else:
-            raise ValueError("Unexpected JSON structure. Expected full export, chat list, or single conversation.")
-        
+        with open_export(input_file) as f:
+            chats = None
+
+            # Stream the chats from a full export when ijson is available,
+            # avoiding building the whole JSON document in memory
+            if ijson is not None:
+                # use_float: ijson yields Decimal for JSON floats by
+                # default, which would leak into the chat dicts handed to
+                # downstream code (location messages carry float coordinates)
+                chats = [chat for chat in ijson.items(f, 'chats.list.item', use_float=True)]
+                if not chats:
+                    # Not a full export; re-parse the whole file below
+                    f.seek(0)
+                    chats = None
+
+            if chats is None:
+                # Full parse: orjson's C decoder is several times faster
+                # than the stdlib on large UTF-8 payloads
+                if orjson is not None:
+                    data = orjson.loads(f.read())
+                else:
+                    data = json.load(f)
+
+                # Handle different JSON structures
+                if 'chats' in data and 'list' in data['chats']:
+                    # Full Telegram export: {"chats": {"list": [...]}}
+                    chats = data['chats']['list']
+                elif isinstance(data, list):
+                    # Array of chats: [...]
+                    chats = data
+                elif isinstance(data, dict) and 'messages' in data:
+                    # Single chat object (extracted conversation): {"name": "...", "messages": [...]}
+                    chats = [data]
+                    print(f"  (Single conversation file detected)")
+                else:
+                    raise ValueError("Unexpected JSON structure. Expected full export, chat list, or single conversation.")
+
         print(f"Loaded {len(chats)} chat(s)")
         return chats
     
@@ -92,10 +192,18 @@ class ChatDataProcessor:
         """Filter out chats with too few messages."""
         filtered_chats = []
         for chat in chats:
-            # Count actual message types (not service messages)
             messages = chat.get('messages', [])
+
+            # The total length is an upper bound on the real message count,
+            # so clearly-too-short chats are dropped without walking their
+            # messages at all
+            if len(messages) < self.min_messages:
+                print(f"  ✗ {chat.get('name', 'Unknown')}: {len(messages)} messages (below threshold)")
+                continue
+
+            # Count actual message types (not service messages)
             message_count = sum(1 for msg in messages if msg.get('type') == 'message')
-            
+
             if message_count >= self.min_messages:
                 filtered_chats.append(chat)
                 print(f"  ✓ {chat.get('name', 'Unknown')}: {message_count} messages")
@@ -105,21 +213,35 @@ class ChatDataProcessor:
         print(f"\nKept {len(filtered_chats)} chats with >= {self.min_messages} messages")
         return filtered_chats
     
+    def _extract_text_str(self, text: str) -> str:
+        """Text is already a plain string."""
+        return text
+
+    def _extract_text_list(self, text: List) -> str:
+        """Text is an array of text entities."""
+        text_parts = []
+        for entity in text:
+            if isinstance(entity, dict) and 'text' in entity:
+                text_parts.append(entity['text'])
+            elif isinstance(entity, str):
+                text_parts.append(entity)
+        return ''.join(text_parts)
+
+    # Dispatch on the exact type of the 'text' field: a dict lookup is
+    # cheaper than an isinstance chain in the per-message hot path
+    _TEXT_EXTRACTORS = {str: _extract_text_str, list: _extract_text_list}
+
     def extract_text(self, message: Dict) -> str:
         """Extract text from a message."""
-        # Handle different text formats
-        if isinstance(message.get('text'), str):
-            return message['text']
-        elif isinstance(message.get('text'), list):
-            # Text is an array of text entities
-            text_parts = []
-            for entity in message['text']:
-                if isinstance(entity, dict) and 'text' in entity:
-                    text_parts.append(entity['text'])
-                elif isinstance(entity, str):
-                    text_parts.append(entity)
-            return ''.join(text_parts)
-        return ''
+        # Read the cached value when the message was already annotated
+        text = message.get('_text')
+        if text is not None:
+            return text
+
+        extractor = self._TEXT_EXTRACTORS.get(type(message.get('text')))
+        if extractor is None:
+            return ''
+        return extractor(self, message['text'])
     
     def is_valid_message(self, message: Dict) -> bool:
         """Check if message is valid (not service, automated, etc.)."""
@@ -143,83 +265,104 @@ class ChatDataProcessor:
         
         return True
     
-    def group_messages_into_turns(self, messages: List[Dict]) -> List[List[Dict]]:
+    def group_messages_into_turns(self, messages: List[Msg]) -> List[List[Msg]]:
         """
         Group messages into turns based on time windows.
         Messages from the same person within turn_window_seconds are grouped together.
         """
         if not messages:
             return []
-        
-        turns = []
-        current_turn = [messages[0]]
-        current_sender = messages[0].get('from')
-        current_time = int(messages[0].get('date_unixtime', 0))
-        
-        for message in messages[1:]:
-            msg_sender = message.get('from')
-            msg_time = int(message.get('date_unixtime', 0))
-            
-            # Check if this message belongs to the current turn
-            if (msg_sender == current_sender and 
-                msg_time - current_time <= self.turn_window_seconds):
-                current_turn.append(message)
-                current_time = msg_time
+
+        # Vectorized path: compute all turn boundaries in one pass over
+        # int64/object arrays instead of a per-message Python loop
+        if np is not None and len(messages) > 1:
+            times = np.fromiter((msg.time for msg in messages),
+                                dtype=np.int64, count=len(messages))
+
+            if _scan_turn_starts is not None:
+                # Encode the handful of distinct senders as int32 indices
+                # and let the JIT-compiled kernel find the boundaries
+                sender_table = {}
+                sender_ids = np.fromiter(
+                    (sender_table.setdefault(msg.sender, len(sender_table)) for msg in messages),
+                    dtype=np.int32, count=len(messages))
+                turn_starts = _scan_turn_starts(times, sender_ids, self.turn_window_seconds)
             else:
-                # Start a new turn
-                turns.append(current_turn)
-                current_turn = [message]
-                current_sender = msg_sender
-                current_time = msg_time
-        
-        # Add the last turn
-        if current_turn:
-            turns.append(current_turn)
-        
+                senders = np.array([msg.sender for msg in messages], dtype=object)
+                boundary = (senders[1:] != senders[:-1]) | (np.diff(times) > self.turn_window_seconds)
+                turn_starts = np.flatnonzero(np.r_[True, boundary])
+
+            turn_ends = np.r_[turn_starts[1:], len(messages)]
+
+            return [messages[start:end] for start, end in zip(turn_starts, turn_ends)]
+
+        # Fallback: scan a packed int64 buffer of the times (8 bytes per
+        # entry instead of a 28-byte Python int object each) and slice
+        # messages at the turn boundaries
+        times = array.array('q', (msg.time for msg in messages))
+
+        turns = []
+        start = 0
+        for i in range(1, len(messages)):
+            # Senders are interned, so identity comparison is enough
+            if (messages[i].sender is not messages[i - 1].sender or
+                    times[i] - times[i - 1] > self.turn_window_seconds):
+                turns.append(messages[start:i])
+                start = i
+        turns.append(messages[start:])
+
         return turns
     
-    def group_turns_into_conversations(self, turns: List[List[Dict]]) -> List[List[List[Dict]]]:
+    def group_turns_into_conversations(self, turns: List[List[Msg]]) -> List[List[List[Msg]]]:
         """
         Group turns into conversations based on time gaps.
         Conversations are separated if there's a gap > conversation_gap_seconds.
         """
         if not turns:
             return []
-        
+
+        # Vectorized path: gaps between the last message of one turn and
+        # the first of the next, computed as one array subtraction
+        if np is not None and len(turns) > 1:
+            first_times = np.fromiter((turn[0].time for turn in turns),
+                                      dtype=np.int64, count=len(turns))
+            last_times = np.fromiter((turn[-1].time for turn in turns),
+                                     dtype=np.int64, count=len(turns))
+
+            if _scan_conversation_starts is not None:
+                conversation_starts = _scan_conversation_starts(first_times, last_times,
+                                                                self.conversation_gap_seconds)
+            else:
+                boundary = (first_times[1:] - last_times[:-1]) > self.conversation_gap_seconds
+                conversation_starts = np.flatnonzero(np.r_[True, boundary])
+
+            conversation_ends = np.r_[conversation_starts[1:], len(turns)]
+
+            return [turns[start:end] for start, end in zip(conversation_starts, conversation_ends)]
+
+        # Fallback: same packed-buffer scan as the turn grouping, over
+        # per-turn first/last times
+        first_times = array.array('q', (turn[0].time for turn in turns))
+        last_times = array.array('q', (turn[-1].time for turn in turns))
+
         conversations = []
-        current_conversation = [turns[0]]
-        
+        start = 0
         for i in range(1, len(turns)):
-            prev_turn_last_msg = current_conversation[-1][-1]
-            curr_turn_first_msg = turns[i][0]
-            
-            prev_time = int(prev_turn_last_msg.get('date_unixtime', 0))
-            curr_time = int(curr_turn_first_msg.get('date_unixtime', 0))
-            
-            time_gap = curr_time - prev_time
-            
-            if time_gap <= self.conversation_gap_seconds:
-                current_conversation.append(turns[i])
-            else:
-                # Start a new conversation
-                conversations.append(current_conversation)
-                current_conversation = [turns[i]]
-        
-        # Add the last conversation
-        if current_conversation:
-            conversations.append(current_conversation)
-        
+            if first_times[i] - last_times[i - 1] > self.conversation_gap_seconds:
+                conversations.append(turns[start:i])
+                start = i
+        conversations.append(turns[start:])
+
         return conversations
     
-    def get_participants(self, conversation: List[List[Dict]], chat_name: str, 
+    def get_participants(self, conversation: List[List[Msg]], chat_name: str,
                          chat_type: str) -> List[str]:
         """Get list of unique participants in a conversation."""
         participants = set()
         for turn in conversation:
             for msg in turn:
-                sender = msg.get('from', '')
-                if sender:
-                    participants.add(sender)
+                if msg.sender:
+                    participants.add(msg.sender)
         
         # For group chats, return the list of participants
         # For personal chats, return just the contact name
@@ -228,29 +371,40 @@ class ChatDataProcessor:
         else:
             return sorted(list(participants - {self.your_name}))
     
-    def format_conversation_for_training(self, 
-                                        conversation: List[List[Dict]], 
+    def format_conversation_for_training(self,
+                                        conversation: List[List[Msg]],
                                         contact_name: str,
-                                        chat_type: str = 'personal_chat') -> Dict:
+                                        chat_type: str = 'personal_chat',
+                                        prompt_cache: Dict = None) -> Dict:
         """
         Format a conversation into the LLM training format with name metadata.
-        
+
+        prompt_cache, when given, memoizes group-chat system prompts by
+        participant set across the conversations of a chat.
+
         Returns a dict with:
         - messages: list of {"role": "system/user/assistant", "name": "...", "content": "..."}
         """
         formatted_messages = []
-        
-        # Get participants for system message
-        participants = self.get_participants(conversation, contact_name, chat_type)
-        
+
         # Add system message
         if chat_type == 'personal_chat':
+            # The only participant is the contact, so there is no need to
+            # collect participants from the messages
             system_prompt = f"You are {self.your_name}, chatting with {contact_name}. Respond naturally in their conversational style."
         else:
-            # Group chat
-            participants_str = ', '.join(participants)
-            system_prompt = f"You are {self.your_name} in a group chat '{contact_name}' with {participants_str}. Respond naturally in the conversational style."
-        
+            # Group chat: the same few participants recur across the
+            # conversations, so the prompt is cached by participant set
+            participants = self.get_participants(conversation, contact_name, chat_type)
+            cache_key = frozenset(participants)
+            if prompt_cache is not None and cache_key in prompt_cache:
+                system_prompt = prompt_cache[cache_key]
+            else:
+                participants_str = ', '.join(participants)
+                system_prompt = f"You are {self.your_name} in a group chat '{contact_name}' with {participants_str}. Respond naturally in the conversational style."
+                if prompt_cache is not None:
+                    prompt_cache[cache_key] = system_prompt
+
         formatted_messages.append({
             "role": "system",
             "content": system_prompt
@@ -258,15 +412,15 @@ class ChatDataProcessor:
         
         # Process each turn in the conversation
         for turn in conversation:
-            # Get all messages in this turn
-            turn_texts = [self.extract_text(msg) for msg in turn]
-            combined_text = ' '.join(turn_texts).strip()
-            
+            # Join the cached texts directly, skipping empty ones, instead
+            # of materializing an intermediate list per turn
+            combined_text = ' '.join(msg.text for msg in turn if msg.text).strip()
+
             if not combined_text:
                 continue
-            
+
             # Determine the role and name based on who sent the message
-            sender = turn[0].get('from')
+            sender = turn[0].sender
             if sender == self.your_name:
                 role = "assistant"
             else:
@@ -281,62 +435,146 @@ class ChatDataProcessor:
         
         return {"messages": formatted_messages}
     
-    def process_chats(self, chats: List[Dict]) -> List[Dict]:
-        """Process all chats and return formatted training data."""
-        all_training_data = []
-        
-        for chat in chats:
-            contact_name = chat.get('name', 'Unknown')
-            chat_type = chat.get('type', 'personal_chat')
-            messages = chat.get('messages', [])
-            
-            print(f"\nProcessing chat with {contact_name} (type: {chat_type})...")
-            
-            # Filter valid messages
-            valid_messages = [msg for msg in messages if self.is_valid_message(msg)]
-            print(f"  Valid messages: {len(valid_messages)}/{len(messages)}")
-            
-            if not valid_messages:
+    def _process_one_chat(self, chat: Dict) -> tuple:
+        """
+        Process a single chat into formatted training examples.
+
+        Returns a (log_lines, training_examples) tuple so the caller can
+        print the per-chat report in order even when chats are processed
+        in parallel.
+        """
+        contact_name = chat.get('name', 'Unknown')
+        chat_type = chat.get('type', 'personal_chat')
+        messages = chat.get('messages', [])
+
+        log = [f"\nProcessing chat with {contact_name} (type: {chat_type})..."]
+
+        # Extract each message's text exactly once; the validity check
+        # and the formatter both read the cached value
+        for msg in messages:
+            msg['_text'] = self.extract_text(msg)
+
+        # Filter valid messages and lay them out as lightweight tuples;
+        # every later pass reads fields instead of hashing dict keys
+        valid_messages = []
+        for msg in messages:
+            if not self.is_valid_message(msg):
                 continue
-            
-            # Group messages into turns
-            turns = self.group_messages_into_turns(valid_messages)
-            print(f"  Grouped into {len(turns)} turns")
-            
-            # Group turns into conversations
-            conversations = self.group_turns_into_conversations(turns)
-            print(f"  Grouped into {len(conversations)} conversations")
-            
-            # Format each conversation for training
-            for i, conversation in enumerate(conversations):
-                # Only include conversations with at least 2 turns (back-and-forth)
-                if len(conversation) >= 2:
-                    formatted = self.format_conversation_for_training(conversation, contact_name, chat_type)
-                    # Only include if there's at least one user and one assistant message
-                    roles = [msg['role'] for msg in formatted['messages']]
-                    if 'user' in roles and 'assistant' in roles:
-                        all_training_data.append(formatted)
-            
-            print(f"  Generated {len([c for c in conversations if len(c) >= 2])} training examples")
-        
-        return all_training_data
+            sender = msg.get('from')
+            if sender:
+                # A chat has only a handful of distinct senders, but JSON
+                # parsing allocates a fresh string per message; interning
+                # collapses them to one object each, so sender comparisons
+                # become pointer checks
+                sender = sys.intern(sender)
+            valid_messages.append(Msg(sender, int(msg.get('date_unixtime', 0)), msg['_text']))
+        log.append(f"  Valid messages: {len(valid_messages)}/{len(messages)}")
+
+        if not valid_messages:
+            return log, []
+
+        # Group messages into turns
+        turns = self.group_messages_into_turns(valid_messages)
+        log.append(f"  Grouped into {len(turns)} turns")
+
+        # Group turns into conversations
+        conversations = self.group_turns_into_conversations(turns)
+        log.append(f"  Grouped into {len(conversations)} conversations")
+
+        # Format each conversation for training
+        chat_training_data = []
+        prompt_cache = {}
+        for conversation in conversations:
+            # Only include conversations with at least 2 turns (back-and-forth)
+            if len(conversation) >= 2:
+                formatted = self.format_conversation_for_training(conversation, contact_name,
+                                                                  chat_type, prompt_cache)
+                # Only include if there's at least one user and one assistant message
+                roles = [msg['role'] for msg in formatted['messages']]
+                if 'user' in roles and 'assistant' in roles:
+                    chat_training_data.append(formatted)
+
+        log.append(f"  Generated {len([c for c in conversations if len(c) >= 2])} training examples")
+        return log, chat_training_data
+
+    def process_chats(self, chats: List[Dict]):
+        """
+        Process all chats, yielding formatted conversations as each chat
+        finishes, so the caller can write them to disk incrementally
+        instead of holding every example in memory at once.
+        """
+        # Chats are independent, so spread them across the CPU cores; a
+        # small chunksize keeps the workers balanced when chat sizes vary.
+        # os.cpu_count() can return None on exotic platforms
+        cpu_count = os.cpu_count() or 1
+        if len(chats) > 1 and cpu_count > 1:
+            with ProcessPoolExecutor(max_workers=cpu_count) as executor:
+                for log, chat_training_data in executor.map(self._process_one_chat, chats,
+                                                            chunksize=4):
+                    print('\n'.join(log))
+                    yield from chat_training_data
+        else:
+            for chat in chats:
+                log, chat_training_data = self._process_one_chat(chat)
+                print('\n'.join(log))
+                yield from chat_training_data
     
-    def save_training_data(self, training_data: List[Dict], output_file: str):
-        """Save training data to JSONL file."""
-        print(f"\nSaving {len(training_data)} training examples to {output_file}...")
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
+    def save_training_data(self, training_data, output_file: str) -> int:
+        """
+        Stream training data to a JSONL file as it is produced.
+
+        training_data can be any iterable (typically the process_chats
+        generator), so only one batch of examples is in memory at a time.
+
+        Returns the number of examples written.
+        """
+        print(f"\nSaving training examples to {output_file}...")
+
+        # Serialize with orjson when available and batch lines into one
+        # buffer, so the file sees one large write per batch instead of
+        # one small write (and syscall) per example
+        batch_lines = 1000
+        total_conversations = 0
+        total_messages = 0
+        f = None
+        try:
+            buf = bytearray()
+            pending = 0
             for example in training_data:
-                f.write(json.dumps(example, ensure_ascii=False) + '\n')
-        
+                if f is None:
+                    # Opened only once the first example arrives, so a run
+                    # that produces nothing leaves no empty file behind
+                    f = open(output_file, 'wb', buffering=1 << 20)
+                if orjson is not None:
+                    buf += orjson.dumps(example)
+                else:
+                    buf += json.dumps(example, ensure_ascii=False).encode('utf-8')
+                buf += b'\n'
+                pending += 1
+                total_conversations += 1
+                total_messages += len(example['messages'])
+                if pending == batch_lines:
+                    f.write(buf)
+                    buf.clear()
+                    pending = 0
+            if buf:
+                f.write(buf)
+        finally:
+            if f is not None:
+                f.close()
+
+        if total_conversations == 0:
+            return 0
+
         print(f"✓ Saved successfully!")
-        
+
         # Print statistics
-        total_messages = sum(len(ex['messages']) for ex in training_data)
         print(f"\nStatistics:")
-        print(f"  Total conversations: {len(training_data)}")
+        print(f"  Total conversations: {total_conversations}")
         print(f"  Total messages: {total_messages}")
-        print(f"  Avg messages per conversation: {total_messages / len(training_data):.1f}")
+        print(f"  Avg messages per conversation: {total_messages / total_conversations:.1f}")
+
+        return total_conversations
 
 
 def main():
@@ -393,15 +631,13 @@ Examples:
         print("\nNo chats meet the criteria. Try lowering --min-messages")
         return
     
-    # Process chats into training data
+    # Process chats into training data, streaming examples to disk as
+    # each chat finishes
     training_data = processor.process_chats(filtered_chats)
-    
-    if not training_data:
+    examples_saved = processor.save_training_data(training_data, args.output)
+
+    if examples_saved == 0:
         print("\nNo training data generated. Check your data and parameters.")
-        return
-    
-    # Save training data
-    processor.save_training_data(training_data, args.output)
 
 
 if __name__ == '__main__':